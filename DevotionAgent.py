@@ -6,50 +6,82 @@ Combines worship reflections, prayers, and song recommendations using AI
 # ============================================================
 # SETUP & IMPORTS
 # ============================================================
-import xml.etree.ElementTree as ET
 from typing import List, Dict, Optional
-from datetime import datetime
+from datetime import datetime, date
 from dataclasses import dataclass
-import uuid
+from contextlib import contextmanager
 import os
 import logging
+import logging.handlers
+import queue
+import atexit
+import threading
 import json
+import hashlib
+import functools
 import time
+import asyncio
+import argparse
+import sys
+import io
 
+import httpx
 from dotenv import load_dotenv
-from google.adk.agents import LlmAgent
-from google.adk.runners import InMemoryRunner
 from google.genai import types, Client
 
-from devotion_tools import get_today_devotion, DevotionSession
-from devotion_agents import (
-    devotion_summary_agent, 
-    devotion_runner,
-    user_input_agent,
-    user_input_runner,
-    prayer_generator_agent,
-    prayer_runner,
-    worship_song_agent,
-    worship_song_runner
-)
+try:
+    # google-genai prefers aiohttp over httpx for async calls when it is installed
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
 
-# Load environment variables from .env file
+# Load environment variables from .env file (before devotion_tools reads them)
 load_dotenv()
 
+from devotion_tools import get_today_devotion, format_devotions_list, DevotionSession, HTTP2_AVAILABLE
+
 # ============================================================
 # LOGGING CONFIGURATION
 # ============================================================
-# Create logs directory if it doesn't exist
-os.makedirs("logs", exist_ok=True)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('logs/devotion_agent.log')
-    ]
-)
+_logging_configured = False
+
+
+def _configure_logging():
+    """
+    Install the log file handler once per process.
+    
+    Skips setup when the root logger already has handlers, so importing this
+    module alongside running it as a script doesn't write every line twice.
+    
+    Records go through a QueueHandler, so a log call only enqueues the record;
+    a background QueueListener formats it and writes it to the log file.
+    """
+    global _logging_configured
+    root_logger = logging.getLogger()
+    if _logging_configured or root_logger.handlers:
+        return
+    
+    # Create logs directory if it doesn't exist
+    os.makedirs("logs", exist_ok=True)
+    
+    file_handler = logging.FileHandler('logs/devotion_agent.log')
+    file_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    
+    log_queue = queue.SimpleQueue()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    # Drain queued records to disk before the interpreter exits
+    atexit.register(listener.stop)
+    _logging_configured = True
+
+
+_configure_logging()
 
 logger = logging.getLogger(__name__)
 logger.info("="*70)
@@ -62,6 +94,112 @@ model_name = os.getenv("MODEL_NAME", "gemini-2.0-flash")
 
 logger.info(f"Model configured: {model_name}")
 
+# Retry transient Gemini API failures (rate limits, server errors)
+retry_config = types.HttpRetryOptions(
+    attempts=5,
+    exp_base=7,
+    initial_delay=1,
+    http_status_codes=[429, 500, 503, 504]
+)
+
+# Devotion schedule read by get_today_devotion()
+DEVOTION_XML_FILE = "data/devotion.xml"
+
+# On-disk cache of each day's devotion passages, keyed by date and schedule mtime
+DEVOTION_CACHE_DIR = "cache/devotion_raw"
+
+# On-disk cache of devotion summaries, keyed by the day's passages
+SUMMARY_CACHE_DIR = "cache/devotion_summaries"
+
+# Console banner rules
+_BAR = "=" * 70 + "\n"
+_DASH = "-" * 70 + "\n"
+
+# Reflections shorter than this (in characters) get one re-prompt
+MIN_REFLECTION_LENGTH = 20
+
+# Batch job polling
+BATCH_POLL_INTERVAL = 5  # seconds
+BATCH_COMPLETED_STATES = {
+    "JOB_STATE_SUCCEEDED",
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED"
+}
+
+
+# ============================================================
+# PROMPT TEMPLATES
+# ============================================================
+_DEVOTION_TMPL = """Here are today's devotion passages:
+
+{devotion_data}
+
+Based on these passages, please provide:
+1. A summary of each passage type (Psalms, Old Testament, New Testament, Proverbs)
+2. 2-3 key Bible verses that support the message
+3. Spiritual insights and themes
+
+Format clearly with sections for each passage type."""
+
+_AFFIRMATION_TMPL = """{devotion_context}
+
+And this user's personal reflection:
+{reflections_text}
+
+Please provide:
+1. A warm, affirming response to their reflection (100 words)
+2. A personalized prayer (200 words) that incorporates the devotion themes and their reflection
+
+Format the response clearly with sections for "Your Affirmation" and "Today's Prayer"."""
+
+_WORSHIP_TMPL = """{devotion_context}
+
+And this user reflection:
+{reflections_text}
+
+Please recommend 5-7 worship songs that align with these themes. For each song, provide:
+- Song title
+- Artist name
+- Spiritual theme
+- YouTube search link
+
+Format like this:
+🎵 **[Song Title]** - [Artist]
+   Theme: [Theme]
+   https://www.youtube.com/results?search_query=[Song+Title]+[Artist]+worship"""
+
+# Fallback content when the user submits an empty reflection
+_GENERIC_PRAYER = """Today's Prayer
+
+Heavenly Father, thank You for speaking through Your Word today. Open my heart
+to the truths in these passages and help me carry them with me through this day.
+Where I am weary, give me strength; where I am uncertain, give me wisdom; and
+where I have fallen short, cover me with Your grace. Teach me to trust Your
+promises and to walk in step with Your Spirit. May my words and actions reflect
+Your love to everyone I meet. In Jesus' name, Amen."""
+
+_GENERIC_SONGS = """🎵 **Goodness of God** - Bethel Music
+   Theme: Faithfulness
+   https://www.youtube.com/results?search_query=Goodness+of+God+Bethel+Music+worship
+
+🎵 **Way Maker** - Sinach
+   Theme: Hope
+   https://www.youtube.com/results?search_query=Way+Maker+Sinach+worship
+
+🎵 **10,000 Reasons (Bless the Lord)** - Matt Redman
+   Theme: Praise
+   https://www.youtube.com/results?search_query=10000+Reasons+Matt+Redman+worship
+
+🎵 **Great Is Thy Faithfulness** - Traditional Hymn
+   Theme: Thanksgiving
+   https://www.youtube.com/results?search_query=Great+Is+Thy+Faithfulness+hymn+worship
+
+🎵 **Build My Life** - Housefires
+   Theme: Surrender
+   https://www.youtube.com/results?search_query=Build+My+Life+Housefires+worship"""
+
+
 # ============================================================
 # DATA STRUCTURES
 # ============================================================
@@ -82,68 +220,396 @@ class DevotionWorkflowResult:
 
 
 # ============================================================
-# GLOBAL STATE
+# GEMINI CLIENT
 # ============================================================
-user_reflections_global = {'data': None}
+_client: Optional[Client] = None
+
+
+def get_client() -> Client:
+    """
+    Return the shared Gemini client, creating it on first use.
+    
+    Reusing one client keeps its HTTP connection pool alive across every
+    request in the workflow instead of renegotiating TLS per call. When async
+    calls go through httpx and the optional h2 package is installed,
+    concurrent requests also multiplex over a single HTTP/2 connection.
+    
+    The httpx options are only passed when aiohttp isn't installed; otherwise
+    google-genai hands async_client_args to aiohttp, which rejects them, and
+    aiohttp's own connection pool is used instead.
+    """
+    global _client
+    if _client is None:
+        use_httpx = not AIOHTTP_AVAILABLE
+        async_client_args = None
+        if use_httpx:
+            async_client_args = {
+                "http2": HTTP2_AVAILABLE,
+                "limits": httpx.Limits(max_connections=8, max_keepalive_connections=4)
+            }
+        _client = Client(
+            api_key=api_key,
+            http_options=types.HttpOptions(
+                timeout=60_000,  # milliseconds
+                retry_options=retry_config,
+                async_client_args=async_client_args
+            )
+        )
+        logger.info(
+            f"Gemini client initialized (async transport: {'httpx' if use_httpx else 'aiohttp'}, "
+            f"HTTP/2: {use_httpx and HTTP2_AVAILABLE})"
+        )
+    return _client
 
 
 # ============================================================
 # USER INPUT COLLECTION
 # ============================================================
-def collect_user_input():
+def _read_reflection() -> str:
     """
-    Collect user's personal reflection on the devotion using standard input.
+    Read reflection text from standard input until two consecutive empty lines.
+    
+    Returns:
+        The reflection text without trailing newlines
     """
-    global user_reflections_global
-    user_reflections_global['data'] = None
+    # Read the buffered stdin stream directly; unlike input(), this ends
+    # cleanly on EOF when the reflection is piped in
+    reflection = io.StringIO()
+    previous_blank = False
+    for line in sys.stdin:
+        is_blank = line.rstrip("\n") == ""
+        if is_blank and previous_blank:
+            break
+        reflection.write(line)
+        previous_blank = is_blank
     
-    logger.info("Starting user input collection")
+    return reflection.getvalue().rstrip("\n")
+
+
+async def run_in_daemon_thread(func):
+    """
+    Run a blocking function on a daemon thread and await its result.
     
-    print("\n" + "="*70)
-    print("YOUR PERSONAL DEVOTION REFLECTION")
-    print("="*70)
-    print("\nShare your thoughts and reflections about today's devotion:\n")
+    Unlike asyncio.to_thread(), the thread isn't part of the loop's executor,
+    so a read blocked on stdin doesn't keep the process alive after Ctrl-C.
     
-    # Collect user input from standard input
-    print("What are your thoughts, insights, or how does this devotion apply to you?")
-    print("(Type your reflection and press Enter twice when done)\n")
+    Args:
+        func: Zero-argument callable to run
+        
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def settle(result, error):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
     
-    lines = []
-    while True:
-        line = input()
-        if line == "":
-            if lines and lines[-1] == "":
-                break
-        lines.append(line)
+    def worker():
+        result, error = None, None
+        try:
+            result = func()
+        except BaseException as e:
+            error = e
+        try:
+            loop.call_soon_threadsafe(settle, result, error)
+        except RuntimeError:
+            pass  # The loop has already shut down
     
-    reflection_text = "\n".join(lines[:-1])  # Remove the last empty line
+    threading.Thread(target=worker, name=getattr(func, "__name__", "worker"), daemon=True).start()
+    return await future
+
+
+def collect_user_input() -> str:
+    """
+    Collect user's personal reflection on the devotion using standard input.
     
-    # Store the reflection
-    user_reflections_global['data'] = {
-        'reflection': reflection_text
-    }
+    Returns:
+        The user's reflection text
+    """
+    logger.info("Starting user input collection")
+    
+    sys.stdout.write(
+        f"\n{_BAR}YOUR PERSONAL DEVOTION REFLECTION\n{_BAR}"
+        "\nShare your thoughts and reflections about today's devotion:\n\n"
+    )
+    
+    # Collect user input from standard input
+    sys.stdout.write(
+        "What are your thoughts, insights, or how does this devotion apply to you?\n"
+        "(Type your reflection and press Enter twice when done)\n\n"
+    )
+    sys.stdout.flush()
+    
+    reflection_text = _read_reflection()
+    
+    # Give the user one more chance before spending Gemini calls on a near-empty reflection
+    if len(reflection_text.strip()) < MIN_REFLECTION_LENGTH:
+        logger.info(f"Short reflection ({len(reflection_text.strip())} characters) - prompting once more")
+        sys.stdout.write(
+            "\nA few more thoughts will help personalize your affirmation and prayer.\n"
+            "(Add to your reflection, or press Enter twice to continue)\n\n"
+        )
+        sys.stdout.flush()
+        additional_text = _read_reflection()
+        if additional_text.strip():
+            reflection_text = f"{reflection_text}\n{additional_text}" if reflection_text.strip() else additional_text
     
     logger.info(f"User reflection collected - length: {len(reflection_text)} characters")
-    logger.debug(f"Reflection content: {reflection_text[:100]}...")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Reflection content: {reflection_text[:100]}...")
     
     print("\n✓ Your reflection has been recorded.\n")
+    return reflection_text
 
 
 # ============================================================
 # UTILITY FUNCTIONS
 # ============================================================
-def safe_print(obj):
-    """Print any object type safely"""
-    if isinstance(obj, list):
-        print("\n".join(str(item) for item in obj))
-    else:
-        print(str(obj))
+@contextmanager
+def timed(label: str):
+    """Log how long the enclosed block took, measured with a monotonic clock."""
+    start = time.perf_counter()
+    yield
+    logger.info("%s completed in %.2fs", label, time.perf_counter() - start)
+
+
+async def generate_text(prompt: str, config: Optional[types.GenerateContentConfig] = None):
+    """
+    Call Gemini asynchronously and return the response text.
+    
+    Args:
+        prompt: Prompt text to send
+        config: Optional generation config (e.g., temperature or safety settings)
+        
+    Returns:
+        Tuple of (response text, API call duration in seconds)
+    """
+    api_call_start = time.perf_counter()
+    response = await get_client().aio.models.generate_content(
+        model=model_name,
+        contents=prompt,
+        config=config
+    )
+    return response.text, time.perf_counter() - api_call_start
+
+
+async def stream_text(prompt: str, config: Optional[types.GenerateContentConfig] = None,
+                      chunk_queue: Optional[asyncio.Queue] = None):
+    """
+    Stream a Gemini response, displaying chunks as they arrive.
+    
+    Chunks are written to stdout immediately, or put on chunk_queue (followed by
+    a None sentinel) when the caller wants to display them later with echo_stream().
+    
+    Args:
+        prompt: Prompt text to send
+        config: Optional generation config (e.g., temperature or safety settings)
+        chunk_queue: Optional queue to receive chunks instead of stdout
+        
+    Returns:
+        Tuple of (full response text, API call duration in seconds)
+    """
+    api_call_start = time.perf_counter()
+    chunks = []
+    try:
+        stream = await get_client().aio.models.generate_content_stream(
+            model=model_name,
+            contents=prompt,
+            config=config
+        )
+        async for chunk in stream:
+            if not chunk.text:
+                continue
+            chunks.append(chunk.text)
+            if chunk_queue is None:
+                sys.stdout.write(chunk.text)
+                sys.stdout.flush()
+            else:
+                chunk_queue.put_nowait(chunk.text)
+    finally:
+        if chunk_queue is not None:
+            chunk_queue.put_nowait(None)
+    
+    return "".join(chunks), time.perf_counter() - api_call_start
+
+
+async def echo_stream(chunk_queue: asyncio.Queue) -> None:
+    """Write chunks queued by stream_text() to stdout until the stream ends."""
+    while (text := await chunk_queue.get()) is not None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+
+async def generate_batch(prompts: List[str]) -> List[str]:
+    """
+    Submit prompts as one inline Gemini batch job and wait for the results.
+    
+    Args:
+        prompts: Prompt texts to submit together
+        
+    Returns:
+        Response texts in the same order as the prompts
+    """
+    requests = [
+        {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        for prompt in prompts
+    ]
+    
+    job = await get_client().aio.batches.create(
+        model=model_name,
+        src=requests,
+        config={"display_name": "devotion-reflection"}
+    )
+    logger.info(f"Batch job {job.name} submitted with {len(requests)} requests")
+    
+    while job.state.name not in BATCH_COMPLETED_STATES:
+        await asyncio.sleep(BATCH_POLL_INTERVAL)
+        job = await get_client().aio.batches.get(name=job.name)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Batch job {job.name} state: {job.state.name}")
+    
+    if job.state.name != "JOB_STATE_SUCCEEDED":
+        raise RuntimeError(f"Batch job {job.name} ended with state {job.state.name}")
+    
+    texts = []
+    for inlined_response in job.dest.inlined_responses:
+        if inlined_response.error:
+            raise RuntimeError(f"Batch request failed: {inlined_response.error}")
+        texts.append(inlined_response.response.text)
+    return texts
+
+
+def _devotion_xml_mtime_ns() -> int:
+    """Modification time of the devotion schedule (0 if it can't be read)."""
+    try:
+        return os.stat(DEVOTION_XML_FILE).st_mtime_ns
+    except OSError:
+        return 0
+
+
+@functools.lru_cache(maxsize=4)
+def load_today_devotion(date_iso: str, xml_mtime_ns: int) -> Dict:
+    """
+    Retrieve today's devotion passages, memoized per date in-process and on disk.
+    
+    Args:
+        date_iso: Today's date in ISO format; used as the cache key
+        xml_mtime_ns: st_mtime_ns of the devotion XML file, so an edited
+            schedule isn't served from a stale cache entry
+        
+    Returns:
+        The get_today_devotion() result dictionary
+    """
+    path = os.path.join(DEVOTION_CACHE_DIR, f"{date_iso}-{xml_mtime_ns}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            logger.info(f"Devotion data loaded from cache: {path}")
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+    
+    devotion_data = get_today_devotion(DEVOTION_XML_FILE)
+    
+    if devotion_data.get("status") == "success":
+        try:
+            os.makedirs(DEVOTION_CACHE_DIR, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(devotion_data, f)
+        except OSError as e:
+            logger.warning(f"Failed to cache devotion data: {e}")
+    
+    return devotion_data
+
+
+def _summary_cache_path(devotion_data: Dict) -> str:
+    """Build the cache file path for a day's passages."""
+    passages = json.dumps(devotion_data.get("devotions", []), sort_keys=True)
+    key = hashlib.sha256(passages.encode("utf-8")).hexdigest()
+    return os.path.join(SUMMARY_CACHE_DIR, f"{date.today().isoformat()}-{key[:16]}.json")
+
+
+def load_cached_summary(devotion_data: Dict) -> Optional[str]:
+    """
+    Load a previously generated summary for the same passages.
+    
+    Args:
+        devotion_data: Result of get_today_devotion()
+        
+    Returns:
+        The cached devotion summary, or None on a cache miss
+    """
+    if devotion_data.get("status") != "success":
+        return None
+    
+    try:
+        with open(_summary_cache_path(devotion_data), encoding="utf-8") as f:
+            return json.load(f)["devotion_summary"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_cached_summary(devotion_data: Dict, devotion_summary: str) -> None:
+    """
+    Persist a generated summary so later runs for the same passages skip the API call.
+    
+    Args:
+        devotion_data: Result of get_today_devotion()
+        devotion_summary: The generated devotion summary
+    """
+    if devotion_data.get("status") != "success":
+        return
+    # An empty reply (e.g. a safety block) would otherwise be served all day
+    if not devotion_summary or not devotion_summary.strip():
+        logger.warning("Empty devotion summary - not caching it")
+        return
+    
+    try:
+        os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+        with open(_summary_cache_path(devotion_data), "w", encoding="utf-8") as f:
+            json.dump({
+                "devotion_summary": devotion_summary,
+                "model": model_name,
+                "timestamp": datetime.now().isoformat()
+            }, f)
+    except OSError as e:
+        logger.warning(f"Failed to cache devotion summary: {e}")
+
+
+async def summarize_devotion(devotion_data: Dict, devotion_prompt: str, chunk_queue: asyncio.Queue):
+    """
+    Produce the devotion summary, from the on-disk cache when possible.
+    
+    Chunks are delivered through chunk_queue either way, so callers display a
+    cached summary the same way as a streamed one. The time to produce the
+    summary is logged as Step 1's duration; it runs while the user types, so
+    it is measured here rather than around the caller's await.
+    
+    Returns:
+        Tuple of (devotion summary, API call duration in seconds)
+    """
+    with timed("[STEP 1] Devotion summary"):
+        cached_summary = load_cached_summary(devotion_data)
+        if cached_summary is not None:
+            logger.info("Devotion summary loaded from cache")
+            chunk_queue.put_nowait(cached_summary)
+            chunk_queue.put_nowait(None)
+            return cached_summary, 0.0
+        
+        devotion_summary, api_call_duration = await stream_text(devotion_prompt, chunk_queue=chunk_queue)
+        save_cached_summary(devotion_data, devotion_summary)
+        return devotion_summary, api_call_duration
 
 
 # ============================================================
 # MAIN WORKFLOW
 # ============================================================
-def run_devotion_workflow():
+async def run_devotion_workflow():
     """
     Execute the complete devotion workflow:
     1. Retrieve and summarize today's devotion
@@ -151,222 +617,231 @@ def run_devotion_workflow():
     3. Generate affirmation and prayer
     4. Discover worship songs
     """
+    # Start reading today's passages right away; the file I/O overlaps with
+    # client setup and the banners below
+    devotion_future = asyncio.create_task(
+        asyncio.to_thread(load_today_devotion, date.today().isoformat(), _devotion_xml_mtime_ns())
+    )
     
     print("\nStarting DevotionAgent workflow...\n")
     
     logger.info("Starting DevotionAgent workflow")
-    workflow_start_time = time.time()
     
     # Initialize session
     devotion_session = DevotionSession()
     logger.info("DevotionSession initialized")
     
     # Initialize Gemini client
-    client = Client(api_key=os.getenv("API_KEY"))
-    logger.info("Gemini client initialized")
+    get_client()
     
     # ============================================================
     # STEP 1: DEVOTION SUMMARY
     # ============================================================
     logger.info("[STEP 1/2] Starting DEVOTION SUMMARY")
-    print("[STEP 1/2] DEVOTION SUMMARY AGENT")
-    print("-" * 70)
-    print("Retrieving and summarizing today's devotion passages...\n")
-    
-    step1_start = time.time()
-    
-    # Get devotion data
-    devotion_data = get_today_devotion()
-    logger.info(f"Devotion data retrieved - length: {len(str(devotion_data))} characters")
-    
-    # Create prompt for devotion summary with actual devotion data
-    devotion_prompt = f"""Here are today's devotion passages:
-
-{devotion_data}
-
-Based on these passages, please provide:
-1. A summary of each passage type (Psalms, Old Testament, New Testament, Proverbs)
-2. 2-3 key Bible verses that support the message
-3. Spiritual insights and themes
-
-Format clearly with sections for each passage type."""
+    sys.stdout.write(
+        f"[STEP 1/2] DEVOTION SUMMARY AGENT\n{_DASH}"
+        "Retrieving and summarizing today's devotion passages...\n\n"
+    )
     
-    # Call Gemini directly
-    logger.info("Calling Gemini API for devotion summary")
-    api_call_start = time.time()
+    with timed("[STEP 1] Summary dispatch"):
+        # Get devotion data
+        devotion_data = await devotion_future
+        logger.info(f"Devotion data retrieved - length: {len(str(devotion_data))} characters")
+        
+        # Create prompt for devotion summary with actual devotion data
+        devotion_prompt = _DEVOTION_TMPL.format(devotion_data=devotion_data)
+        
+        # Start the Gemini request now so the round-trip overlaps with the user
+        # writing their reflection in Step 2
+        logger.info("Calling Gemini API for devotion summary")
+        summary_queue = asyncio.Queue()
+        summary_task = asyncio.create_task(
+            summarize_devotion(devotion_data, devotion_prompt, summary_queue)
+        )
+        
+        print(format_devotions_list(devotion_data.get("devotions", [])))
+        
+    # ============================================================
+    # STEP 2: COLLECT USER INPUT
+    # ============================================================
+    logger.info("[STEP 2/2] Starting user input collection")
+    sys.stdout.write(f"\n[STEP 2/2] COLLECT YOUR REFLECTION\n{_DASH}")
     
-    devotion_response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=devotion_prompt
-    )
+    # Show input form; run it off the event loop so the summary request keeps going
+    reflection_text = await run_in_daemon_thread(collect_user_input)
     
-    api_call_duration = time.time() - api_call_start
-    devotion_summary = devotion_response.text
+    # Show whatever has streamed in while the user was typing, then the rest live
+    print("TODAY'S DEVOTION SUMMARY\n")
+    await echo_stream(summary_queue)
+    devotion_summary, api_call_duration = await summary_task
+    print("\n\n✓ Devotion summary retrieved")
     
     logger.info(f"Devotion summary received - length: {len(devotion_summary)} characters, API call duration: {api_call_duration:.2f}s")
     
-    print("✓ Devotion summary retrieved\n")
-    print(devotion_summary)
-    
     devotion_session.save_devotion_summary(devotion_summary)
     logger.info("Devotion summary saved to session")
     print("\n✓ Devotion summary saved to session")
     
-    step1_duration = time.time() - step1_start
-    logger.info(f"[STEP 1] Completed in {step1_duration:.2f}s")
-    
-    # ============================================================
-    # STEP 2: COLLECT USER INPUT
-    # ============================================================
-    logger.info("[STEP 2/2] Starting user input collection")
-    print("\n[STEP 2/2] COLLECT YOUR REFLECTION")
-    print("-" * 70)
-    
-    # Show input form
-    collect_user_input()
-    
     logger.info("Returning to complete workflow after user input")
-    return devotion_session, devotion_summary, client
+    return devotion_session, devotion_summary, reflection_text
 
 
-def complete_devotion_workflow(devotion_session, devotion_summary, client):
-    """
-    Complete the workflow after user reflection is submitted.
+def build_affirmation_prompt(devotion_context: str, reflections_text: str) -> str:
+    """Build the Step 3 prompt for the affirmation and personalized prayer."""
+    return _AFFIRMATION_TMPL.format(devotion_context=devotion_context, reflections_text=reflections_text)
+
+
+def build_worship_prompt(devotion_context: str, reflections_text: str) -> str:
     """
-    logger.info("Starting workflow completion phase")
-    completion_start_time = time.time()
-    
-    # Check if reflection was submitted
-    if user_reflections_global['data'] is None:
-        logger.error("User reflection not submitted")
-        print("❌ Please submit your reflection first by running the collection step.")
-        return None
+    Build the Step 4 prompt for worship song recommendations.
     
-    user_reflections = user_reflections_global['data']
-    devotion_session.save_user_reflection(user_reflections['reflection'])
+    Song themes come from the devotion and the reflection alone, so this prompt
+    does not wait on the Step 3 affirmation.
+    """
+    return _WORSHIP_TMPL.format(devotion_context=devotion_context, reflections_text=reflections_text)
+
+
+async def run_reflection_steps(devotion_session, devotion_summary: str, reflections_text: str):
+    """
+    Run Steps 3 and 4 (affirmation/prayer and worship songs) concurrently in real time.
     
-    reflections_text = user_reflections['reflection']
+    Returns:
+        Tuple of (affirmation and prayer text, worship songs text)
+    """
+    devotion_context = f"Based on this devotion summary:\n\n{devotion_summary}"
     
     # ============================================================
-    # STEP 3: PROCESS REFLECTION & GENERATE AFFIRMATION
+    # STEPS 3 & 4: AFFIRMATION AND WORSHIP SONGS
     # ============================================================
     logger.info("[STEP 3/4] Starting reflection processing and affirmation generation")
-    step3_start = time.time()
+    logger.info("[STEP 4/4] Starting worship song discovery")
     
-    print("\n[STEP 3/4] PROCESSING YOUR REFLECTION & GENERATING AFFIRMATION")
-    print("-" * 70)
-    print("Creating affirmation and personalized prayer...\n")
+    with timed("[STEPS 3-4]"):
+        sys.stdout.write(
+            f"\n[STEP 3/4] PROCESSING YOUR REFLECTION & GENERATING AFFIRMATION\n{_DASH}"
+            "Creating affirmation and personalized prayer...\n\n"
+        )
+        
+        combined_prompt = build_affirmation_prompt(devotion_context, reflections_text)
+        worship_prompt = build_worship_prompt(devotion_context, reflections_text)
+        
+        # The two prompts are independent, so both requests run concurrently;
+        # the affirmation streams to the screen while the songs are generated
+        logger.info("Calling Gemini API for affirmation, prayer, and worship song recommendations")
+        (combined_text, step3_api_duration), (worship_text, step4_api_duration) = await asyncio.gather(
+            stream_text(combined_prompt),
+            generate_text(worship_prompt)
+        )
+        
+        logger.info(f"Affirmation and prayer generated - length: {len(combined_text)} characters, API duration: {step3_api_duration:.2f}s")
+        print("\n\n✓ Reflection processed and prayer generated")
+        devotion_session.save_user_input_processing(combined_text)
+        logger.info("Affirmation and prayer saved to session")
+        
+        sys.stdout.write(f"\n[STEP 4/4] DISCOVERING WORSHIP SONGS\n{_DASH}")
+        logger.info(f"Worship songs discovered - length: {len(worship_text)} characters, API duration: {step4_api_duration:.2f}s")
+        print("✓ Worship songs discovered\n")
     
-    # Create a combined prompt for processing and prayer
-    combined_prompt = f"""Based on this devotion summary:
+    return combined_text, worship_text
 
-{devotion_summary}
 
-And this user's personal reflection:
-{reflections_text}
-
-Please provide:
-1. A warm, affirming response to their reflection (100 words)
-2. A personalized prayer (200 words) that incorporates the devotion themes and their reflection
-
-Format the response clearly with sections for "Your Affirmation" and "Today's Prayer"."""
-    
-    # Call Gemini directly
-    logger.info("Calling Gemini API for affirmation and prayer")
-    step3_api_start = time.time()
-    
-    combined_response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=combined_prompt
-    )
-    
-    step3_api_duration = time.time() - step3_api_start
-    combined_text = combined_response.text
-    
-    logger.info(f"Affirmation and prayer generated - length: {len(combined_text)} characters, API duration: {step3_api_duration:.2f}s")
-    print("✓ Reflection processed and prayer generated\n")
-    devotion_session.save_user_input_processing(combined_text)
-    logger.info("Affirmation and prayer saved to session")
+async def run_reflection_steps_batch(devotion_session, devotion_summary: str, reflections_text: str):
+    """
+    Run Steps 3 and 4 as a single Gemini inline batch job.
     
-    step3_duration = time.time() - step3_start
-    logger.info(f"[STEP 3] Completed in {step3_duration:.2f}s")
+    Batch jobs are billed at a discount but are not real-time.
     
-    # ============================================================
-    # STEP 4: DISCOVER WORSHIP SONGS
-    # ============================================================
-    logger.info("[STEP 4/4] Starting worship song discovery")
-    step4_start = time.time()
+    Returns:
+        Tuple of (affirmation and prayer text, worship songs text)
+    """
+    logger.info("[STEPS 3-4/4] Starting batch affirmation and worship song generation")
     
-    print("\n[STEP 4/4] DISCOVERING WORSHIP SONGS")
-    print("-" * 70)
-    print("Finding worship songs that match today's spiritual themes...\n")
+    with timed("[STEPS 3-4]"):
+        sys.stdout.write(
+            f"\n[STEPS 3-4/4] GENERATING AFFIRMATION & DISCOVERING WORSHIP SONGS (BATCH)\n{_DASH}"
+            "Submitting batch request for your affirmation, prayer, and worship songs...\n\n"
+        )
+        
+        devotion_context = f"Based on this devotion summary:\n\n{devotion_summary}"
+        prompts = [
+            build_affirmation_prompt(devotion_context, reflections_text),
+            build_worship_prompt(devotion_context, reflections_text)
+        ]
+        
+        combined_text, worship_text = await generate_batch(prompts)
+        
+        logger.info(f"Batch results received - affirmation: {len(combined_text)} characters, worship songs: {len(worship_text)} characters")
+        print("✓ Reflection processed, prayer generated, and worship songs discovered\n")
+        devotion_session.save_user_input_processing(combined_text)
+        logger.info("Affirmation and prayer saved to session")
     
-    # Create a worship prompt with context
-    worship_prompt = f"""Based on this devotion:
-
-{devotion_summary}
+    return combined_text, worship_text
 
-And this user reflection:
-{reflections_text}
 
-And this affirmation and prayer:
-{combined_text}
-
-Please recommend 5-7 worship songs that align with these themes. For each song, provide:
-- Song title
-- Artist name
-- Spiritual theme
-- YouTube search link
-
-Format like this:
-🎵 **[Song Title]** - [Artist]
-   Theme: [Theme]
-   https://www.youtube.com/results?search_query=[Song+Title]+[Artist]+worship"""
-    
-    logger.info("Calling Gemini API for worship song recommendations")
-    step4_api_start = time.time()
-    # Call Gemini directly
-    worship_response = client.models.generate_content(
-        model="gemini-2.0-flash",
-        contents=worship_prompt
-    )
-    
-    step4_api_duration = time.time() - step4_api_start
-    worship_text = worship_response.text
+async def complete_devotion_workflow(devotion_session, devotion_summary, reflections_text, use_batch: bool = False):
+    """
+    Complete the workflow after user reflection is submitted.
     
-    logger.info(f"Worship songs discovered - length: {len(worship_text)} characters, API duration: {step4_api_duration:.2f}s")
+    Args:
+        devotion_session: The DevotionSession for this workflow
+        devotion_summary: The devotion summary from Step 1
+        reflections_text: The user's reflection from Step 2
+        use_batch: Submit Steps 3 and 4 as one discounted batch job instead of real-time calls
+    """
+    logger.info("Starting workflow completion phase")
+    completion_start_time = time.perf_counter()
     
-    print("✓ Worship songs discovered\n")
+    # Check if reflection was submitted
+    if reflections_text is None:
+        logger.error("User reflection not submitted")
+        print("❌ Please submit your reflection first by running the collection step.")
+        return None
     
-    step4_duration = time.time() - step4_start
-    logger.info(f"[STEP 4] Completed in {step4_duration:.2f}s")
+    devotion_session.save_user_reflection(reflections_text)
+    
+    # Nothing to personalize; skip both Gemini calls
+    if not reflections_text.strip():
+        logger.info("Empty reflection - returning generic prayer and worship songs")
+        sys.stdout.write(
+            f"\n[2] TODAY'S PRAYER\n{_DASH}{_GENERIC_PRAYER}\n"
+            f"\n[3] WORSHIP SONGS\n{_DASH}{_GENERIC_SONGS}\n"
+            f"\n{_BAR}✓ DEVOTION AGENT WORKFLOW COMPLETED SUCCESSFULLY\n{_BAR}\n"
+        )
+        devotion_session.save_user_input_processing(_GENERIC_PRAYER)
+        return DevotionWorkflowResult(
+            status="success",
+            devotion_summary=devotion_summary,
+            user_input=reflections_text,
+            prayer_response=_GENERIC_PRAYER,
+            worship_songs=_GENERIC_SONGS
+        )
+    
+    if use_batch:
+        combined_text, worship_text = await run_reflection_steps_batch(
+            devotion_session, devotion_summary, reflections_text
+        )
+    else:
+        combined_text, worship_text = await run_reflection_steps(
+            devotion_session, devotion_summary, reflections_text
+        )
     
     # ============================================================
     # DISPLAY RESULTS
     # ============================================================
     logger.info("Displaying workflow results")
-    
-    print("\n[1] TODAY'S DEVOTION SUMMARY")
-    print("-" * 70)
-    safe_print(devotion_summary)
-    
-    print("\n[2] YOUR REFLECTION & AFFIRMATION")
-    print("-" * 70)
-    print("Your Reflection:")
-    print(reflections_text)
-    print("\n" + combined_text)
-    
-    print("\n[3] WORSHIP SONGS")
-    print("-" * 70)
-    safe_print(worship_text)
-    
-    print("\n" + "="*70)
-    print("✓ DEVOTION AGENT WORKFLOW COMPLETED SUCCESSFULLY")
-    print("="*70 + "\n")
+
+    # The real-time path already streamed the affirmation during Step 3
+    affirmation_block = f"\n{combined_text}\n" if use_batch else ""
+    sys.stdout.write(
+        f"\n[1] TODAY'S DEVOTION SUMMARY\n{_DASH}{devotion_summary}\n"
+        f"\n[2] YOUR REFLECTION & AFFIRMATION\n{_DASH}Your Reflection:\n{reflections_text}\n"
+        f"{affirmation_block}"
+        f"\n[3] WORSHIP SONGS\n{_DASH}{worship_text}\n"
+        f"\n{_BAR}✓ DEVOTION AGENT WORKFLOW COMPLETED SUCCESSFULLY\n{_BAR}\n"
+    )
     
     # Calculate total workflow duration
-    total_duration = time.time() - completion_start_time
-    logger.info(f"Workflow completion phase finished in {total_duration:.2f}s")
+    logger.info("Workflow completion phase finished in %.2fs", time.perf_counter() - completion_start_time)
     logger.info("="*70)
     logger.info("DEVOTION AGENT WORKFLOW COMPLETED SUCCESSFULLY")
     logger.info("="*70)
@@ -381,13 +856,26 @@ Format like this:
     )
 
 
+async def main(use_batch: bool = False):
+    """Run both workflow phases on a single event loop so the Gemini client's connections are reused."""
+    devotion_session, devotion_summary, reflection_text = await run_devotion_workflow()
+    
+    # After user submits reflection, complete the workflow
+    return await complete_devotion_workflow(devotion_session, devotion_summary, reflection_text, use_batch)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the DevotionAgent workflow")
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Generate the affirmation and worship songs as one discounted batch job (slower, not real-time)"
+    )
+    args = parser.parse_args()
+    
     # Run the devotion workflow
     try:
-        devotion_session, devotion_summary, client = run_devotion_workflow()
-        
-        # After user submits reflection, complete the workflow
-        result = complete_devotion_workflow(devotion_session, devotion_summary, client)
+        result = asyncio.run(main(args.batch))
         
         if result:
             logger.info(f"Final result status: {result.status}")
@@ -6,20 +6,27 @@ Contains agent definitions for the DevotionAgent workflow:
 - User Input Agent: Processes personal reflections
 - Prayer Generator Agent: Generates personalized prayers
 - Worship Song Agent: Discovers worship songs via YouTube Music MCP
+
+run_pipeline() orchestrates the agents, running independent ones concurrently.
 """
 
+from dotenv import load_dotenv
 from google.adk.agents import LlmAgent
 from google.adk.runners import InMemoryRunner
-from devotion_tools import get_today_devotion
-import os
+from google.genai import types
+
+# Load API keys before the tools module is first used
+load_dotenv()
+
+from devotion_tools import (
+    get_today_devotion, DevotionSession, extract_themes,
+    search_worship_songs, search_worship_songs_batch, YOUTUBE_AVAILABLE
+)
+import asyncio
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 
-try:
-    import googleapiclient.discovery
-    YOUTUBE_AVAILABLE = True
-except ImportError:
-    YOUTUBE_AVAILABLE = False
+if not YOUTUBE_AVAILABLE:
     logging.warning("YouTube API client not installed. Install with: pip install google-api-python-client")
 
 logger = logging.getLogger(__name__)
@@ -88,67 +95,6 @@ user_input_runner = InMemoryRunner(
 )
 
 
-# ============================================================
-# YOUTUBE SEARCH TOOL
-# ============================================================
-
-def search_worship_songs(query: str, max_results: int = 5) -> List[Dict]:
-    """
-    Search YouTube for worship songs using the YouTube Data API.
-    
-    Args:
-        query: Search query for worship songs
-        max_results: Maximum number of results to return
-        
-    Returns:
-        List of dictionaries containing song title, artist, and YouTube URL
-    """
-    if not YOUTUBE_AVAILABLE:
-        logger.error("YouTube API client not available")
-        return [{"error": "YouTube API client not installed. Run: pip install google-api-python-client"}]
-    
-    try:
-        youtube_api_key = os.getenv("YOUTUBE_API_KEY")
-        if not youtube_api_key:
-            logger.warning("YOUTUBE_API_KEY not configured in .env file")
-            return [{"error": "YOUTUBE_API_KEY not configured in .env file"}]
-        
-        logger.info(f"Searching YouTube for: {query}")
-        
-        youtube = googleapiclient.discovery.build(
-            "youtube", "v3", developerKey=youtube_api_key
-        )
-        
-        request = youtube.search().list(
-            q=query,
-            part="snippet",
-            type="video",
-            maxResults=max_results,
-            order="relevance",
-            videoCategoryId="10"  # Music category
-        )
-        
-        response = request.execute()
-        
-        results = []
-        for item in response.get("items", []):
-            result = {
-                "title": item["snippet"]["title"],
-                "channel": item["snippet"]["channelTitle"],
-                "video_id": item["id"]["videoId"],
-                "url": f"https://www.youtube.com/watch?v={item['id']['videoId']}"
-            }
-            results.append(result)
-            logger.debug(f"Found: {result['title']} by {result['channel']}")
-        
-        logger.info(f"YouTube search returned {len(results)} results")
-        return results
-    
-    except Exception as e:
-        logger.error(f"YouTube search failed: {str(e)}")
-        return [{"error": f"YouTube search failed: {str(e)}"}]
-
-
 # ============================================================
 # PRAYER GENERATOR AGENT
 # ============================================================
@@ -188,7 +134,7 @@ worship_song_agent = LlmAgent(
     instruction="""You are a worship music specialist. Based on the spiritual themes and emotional tone from today's devotion and prayer, you will:
 
 1. Identify 3-5 key spiritual themes from the devotion (e.g., faith, peace, hope, grace, strength, surrender, praise, thanksgiving, redemption, guidance, healing)
-2. Use the search_worship_songs() function to find 5-7 appropriate Christian worship songs that match these themes
+2. Use the search_worship_songs() function to find 5-7 appropriate Christian worship songs that match these themes (each call returns a "status" and a list of "results"; if the status is "error", move on to another query)
 3. For each song found, provide the title, artist/channel name, the spiritual theme it addresses, AND the direct YouTube link
 
 Call search_worship_songs() with queries like:
@@ -217,3 +163,119 @@ worship_song_runner = InMemoryRunner(
     agent=worship_song_agent,
     app_name="worship_song_discovery"
 )
+
+
+# ============================================================
+# PIPELINE ORCHESTRATION
+# ============================================================
+
+PIPELINE_USER_ID = "devotion_user"
+
+
+async def run_agent(runner: InMemoryRunner, prompt: str, user_id: str = PIPELINE_USER_ID) -> str:
+    """
+    Run a single agent turn in a fresh session and return its final response.
+    
+    Args:
+        runner: Runner wrapping the agent to invoke
+        prompt: User message sent to the agent
+        user_id: User the runner session belongs to
+    
+    Returns:
+        Text of the agent's final response ("" if it produced none)
+    """
+    session = await runner.session_service.create_session(
+        app_name=runner.app_name, user_id=user_id
+    )
+    message = types.Content(role="user", parts=[types.Part(text=prompt)])
+    
+    final_text = ""
+    async for event in runner.run_async(user_id=user_id, session_id=session.id, new_message=message):
+        if event.is_final_response() and event.content and event.content.parts:
+            final_text = "".join(part.text or "" for part in event.content.parts)
+    return final_text
+
+
+async def _run_worship_songs(context: str, themes: List[str]) -> str:
+    """
+    Run the worship song agent, searching for the given themes up front.
+    
+    When themes were found in the devotion summary the searches are issued
+    directly and their results handed to the agent, so it only formats the
+    recommendations instead of spending extra turns picking themes and
+    calling the search tool.
+    
+    Args:
+        context: Session context for the agent
+        themes: Themes extracted from the devotion summary (may be empty)
+    
+    Returns:
+        The worship song agent's recommendations
+    """
+    if not themes:
+        return await run_agent(worship_song_runner, context)
+    
+    queries = [f"Christian worship songs about {theme}" for theme in themes]
+    search_results = await search_worship_songs_batch(queries)
+    
+    lines = [context, f"Today's devotion themes: {', '.join(themes)}", "", "Search results:"]
+    for query, response in search_results.items():
+        lines.append(f"\n{query}:")
+        if response["status"] != "success":
+            lines.append(f"- (search failed: {response['error']})")
+        for result in response["results"]:
+            lines.append(f"- {result['title']} | {result['channel']} | {result['url']}")
+    lines.append("\nUse these search results for your recommendations; only call "
+                 "search_worship_songs() if they are insufficient.")
+    
+    return await run_agent(worship_song_runner, "\n".join(lines))
+
+
+async def run_pipeline(reflection_text: str = "",
+                       devotion_session: Optional[DevotionSession] = None) -> Dict:
+    """
+    Run the full agent pipeline for today's devotion.
+    
+    The devotion summary is generated first since every other agent builds on
+    it. The remaining agents only read the shared session context, so they run
+    concurrently and the pipeline waits on the slowest of them rather than
+    their sum.
+    
+    Args:
+        reflection_text: The user's personal reflection ("" to skip reflection processing)
+        devotion_session: Session to record results in (a new one is created if omitted)
+    
+    Returns:
+        Dictionary with the session, prayer and worship song recommendations
+    """
+    session = devotion_session or DevotionSession()
+    
+    logger.info("Pipeline: running devotion summary agent")
+    summary = await run_agent(
+        devotion_runner, "Retrieve and summarize today's devotion passages."
+    )
+    session.save_devotion_summary(summary)
+    if reflection_text:
+        session.save_user_reflection(reflection_text)
+    
+    context = session.get_full_session_context()
+    
+    logger.info("Pipeline: running reflection, prayer and worship agents concurrently")
+    tasks = [
+        run_agent(prayer_runner, context),
+        _run_worship_songs(context, extract_themes(summary)),
+    ]
+    if reflection_text:
+        tasks.append(run_agent(user_input_runner, context))
+    
+    prayer, worship_songs, *processing = await asyncio.gather(*tasks)
+    
+    session.save_prayer(prayer)
+    if processing:
+        session.save_user_input_processing(processing[0])
+    
+    return {
+        "session": session,
+        "prayer": prayer,
+        "worship_songs": worship_songs
+    }
@@ -4,19 +4,147 @@ Provides utilities for retrieving and formatting Bible devotion passages.
 """
 
 import xml.etree.ElementTree as ET
-from typing import List, Dict
-from datetime import datetime
+from typing import List, Dict, Optional, Tuple, Sequence, Iterable
+from datetime import datetime, date as date_type
+from calendar import isleap
+from dataclasses import dataclass, field
 import os
+import sys
+from os import urandom
+import re
+import json
+import time
+import hashlib
 import logging
+import functools
+import asyncio
+import inspect
+import atexit
+import threading
+import itertools
+import collections
+import collections.abc
+from array import array
+
+try:
+    from lxml.etree import iterparse as _iterparse, XMLSyntaxError
+    LXML_AVAILABLE = True
+    XML_PARSE_ERRORS = (ET.ParseError, XMLSyntaxError)
+except ImportError:
+    _iterparse = ET.iterparse
+    LXML_AVAILABLE = False
+    XML_PARSE_ERRORS = (ET.ParseError,)
 
 try:
     import googleapiclient.discovery
+    import httplib2  # installed with google-api-python-client
     YOUTUBE_AVAILABLE = True
 except ImportError:
     YOUTUBE_AVAILABLE = False
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import httpx
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+try:
+    import h2  # HTTP/2 support for httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Child elements copied from each <daily_devotion> entry
+_DEVOTION_FIELDS = ('book', 'start_chapter', 'start_verse', 'end_chapter', 'end_verse', 'type', 'order')
+
+# Day number -> devotion dicts, built from a single parse of the XML file
+_DEVOTION_INDEX: Dict[int, List[Dict[str, str]]] = {}
+# (absolute path, st_mtime_ns) of the file _DEVOTION_INDEX was built from
+_DEVOTION_MTIME: Optional[Tuple[str, int]] = None
+
+
+def _load_index(xml_file: str) -> Dict[int, List[Dict[str, str]]]:
+    """
+    Return the day index for the devotion XML file, parsing it only when needed.
+    
+    The file is re-parsed only if its path or modification time changed since
+    the index was last built. Each entry's passage reference is formatted once
+    here and stored under 'formatted' (left unset for entries whose chapter or
+    verse numbers are missing or invalid). The file is streamed with iterparse
+    (lxml's when installed) and each entry is cleared once indexed, so the full
+    tree is never held in memory. Parse and file errors are propagated to the caller.
+    
+    Args:
+        xml_file: Path to the devotion XML file
+    
+    Returns:
+        Dictionary mapping day number to that day's devotion dictionaries
+    """
+    global _DEVOTION_INDEX, _DEVOTION_MTIME
+    
+    xml_path = os.path.abspath(xml_file)
+    source = (xml_path, os.stat(xml_path).st_mtime_ns)
+    if source == _DEVOTION_MTIME:
+        return _DEVOTION_INDEX
+    
+    index: Dict[int, List[Dict[str, str]]] = {}
+    for _, devotion in _iterparse(xml_path, events=('end',)):
+        if devotion.tag != 'daily_devotion':
+            continue
+        children = {child.tag: child.text for child in devotion}
+        day_text = children.get('day')
+        if day_text:
+            devotion_dict = {field: children.get(field) for field in _DEVOTION_FIELDS}
+            try:
+                devotion_dict['formatted'] = format_devotion(devotion_dict)
+            except (TypeError, ValueError) as e:
+                # Leave 'formatted' unset so only this entry's day is affected,
+                # when format_devotions_list() formats it again
+                logger.warning(f"Malformed devotion entry for day {day_text}: {e}")
+            index.setdefault(int(day_text), []).append(devotion_dict)
+        devotion.clear()
+    
+    _DEVOTION_INDEX = index
+    _DEVOTION_MTIME = source
+    logger.info(f"Indexed {sum(len(v) for v in index.values())} devotions from {xml_path}")
+    return index
+
+
+# Year -> ordinal of January 1st, filled lazily by _day_of_year()
+_JAN1_ORD: Dict[int, int] = {}
+
+
+@functools.lru_cache(maxsize=8)
+def _day_of_year(day: date_type) -> int:
+    """
+    Map a date onto the 365-day devotion schedule.
+    
+    Days after February 29 in a leap year are shifted back by one so that
+    every year uses the same numbering.
+    
+    Args:
+        day: Calendar date (must not be February 29)
+    
+    Returns:
+        Day number in the schedule (1-365)
+    """
+    jan1 = _JAN1_ORD.get(day.year)
+    if jan1 is None:
+        jan1 = _JAN1_ORD[day.year] = date_type(day.year, 1, 1).toordinal()
+    
+    day_of_year = day.toordinal() - jan1 + 1
+    if day.month > 2 and isleap(day.year):
+        day_of_year -= 1
+    return day_of_year
+
 
 def get_daily_devotion(xml_file: str, day: int) -> List[Dict[str, str]]:
     """
@@ -30,25 +158,7 @@ def get_daily_devotion(xml_file: str, day: int) -> List[Dict[str, str]]:
         List of dictionaries containing devotion information
     """
     try:
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
-        
-        devotions = []
-        for devotion in root.findall('daily_devotion'):
-            day_elem = devotion.find('day')
-            if day_elem is not None and int(day_elem.text) == day:
-                devotion_dict = {
-                    'book': devotion.find('book').text,
-                    'start_chapter': devotion.find('start_chapter').text,
-                    'start_verse': devotion.find('start_verse').text,
-                    'end_chapter': devotion.find('end_chapter').text,
-                    'end_verse': devotion.find('end_verse').text,
-                    'type': devotion.find('type').text,
-                    'order': devotion.find('order').text
-                }
-                devotions.append(devotion_dict)
-        
-        return devotions
+        return [dict(devotion) for devotion in _load_index(xml_file).get(day, [])]
     except Exception as e:
         print(f"Error reading XML file: {e}")
         return []
@@ -109,6 +219,8 @@ def get_today_devotion(xml_file: str = r"data/devotion.xml") -> Dict:
                 - 'end_verse': Ending verse number as string
                 - 'type': Category of passage (e.g., "Psalm", "New Testament", "Old Testament", "Proverbs")
                 - 'order': Order of passage within the day as string
+                - 'formatted': Passage reference from format_devotion() (e.g., "Psalm 23:1-6"),
+                  absent if the entry's chapter or verse numbers are malformed
             
             Status values:
             - "success": Devotions were successfully retrieved (devotions list is populated)
@@ -149,16 +261,15 @@ def get_today_devotion(xml_file: str = r"data/devotion.xml") -> Dict:
                 "day_of_year": None
             }
         
-        # Calculate day of year
-        day_of_year = date.timetuple().tm_yday
-        
-        # If after February 29 in a leap year, subtract 1
-        if date.month > 2 and (date.year % 4 == 0 and (date.year % 100 != 0 or date.year % 400 == 0)):
-            day_of_year -= 1
+        # Calculate day of year (leap years shifted after February 29)
+        day_of_year = _day_of_year(date.date())
         
         # Retrieve devotions for the calculated day
         try:
-            devotions = get_daily_devotion(xml_file, day_of_year)
+            devotions = [
+                dict(devotion)
+                for devotion in _load_index(xml_file).get(day_of_year, [])
+            ]
         except FileNotFoundError:
             return {
                 "status": "error",
@@ -167,7 +278,7 @@ def get_today_devotion(xml_file: str = r"data/devotion.xml") -> Dict:
                 "date": date_str,
                 "day_of_year": day_of_year
             }
-        except ET.ParseError as e:
+        except XML_PARSE_ERRORS as e:
             return {
                 "status": "error",
                 "devotions": [],
@@ -226,102 +337,412 @@ def format_devotions_list(devotions: List[Dict[str, str]]) -> str:
     if not devotions:
         return "No devotions found."
     
-    devotion_text = "Today's Devotion Passages:\n"
+    parts = ["Today's Devotion Passages:"]
     for devotion in devotions:
-        formatted = format_devotion(devotion)
-        devotion_type = devotion.get('type', 'Unknown')
-        devotion_text += f"\n{devotion_type}: {formatted}\n"
+        formatted = devotion.get('formatted') or format_devotion(devotion)
+        parts.append(f"{devotion.get('type', 'Unknown')}: {formatted}")
     
-    return devotion_text
+    return "\n\n".join(parts) + "\n"
 
 
 # ============================================================
 # YOUTUBE SEARCH TOOL
 # ============================================================
 
-def search_worship_songs(query: str, max_results: int = 5) -> List[Dict]:
+YOUTUBE_SEARCH_URL = "https://www.googleapis.com/youtube/v3/search"
+
+
+@functools.lru_cache(maxsize=None)
+def _youtube_api_key() -> Optional[str]:
+    """Read YOUTUBE_API_KEY once, on first use, so a later load_dotenv() still counts."""
+    return os.getenv("YOUTUBE_API_KEY")
+
+
+# Cached search results, one JSON file per normalized query
+SONG_CACHE_DIR = "cache/worship_songs"
+SONG_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+# Spiritual themes the worship song agent recommends songs for
+WORSHIP_THEMES = (
+    "faith", "peace", "hope", "grace", "strength", "surrender",
+    "praise", "thanksgiving", "redemption", "guidance", "healing"
+)
+
+# Words that don't change what a worship song search is about; theme
+# words are never filler, or a "praise" search would collapse into
+# every other query
+_QUERY_FILLER = frozenset({
+    "a", "about", "and", "christian", "for", "gospel", "music", "of",
+    "on", "song", "songs", "the", "to", "with", "worship"
+}) - frozenset(WORSHIP_THEMES)
+_QUERY_TOKEN_RE = re.compile(r"[a-z0-9']+")
+_THEME_RE = re.compile(r"\b(" + "|".join(WORSHIP_THEMES) + r")\b", re.IGNORECASE)
+
+# Per-thread YouTube Data API clients, built on first use by _get_youtube_client().
+# httplib2.Http isn't thread-safe and ADK may run sync tools off the loop
+# thread, so every thread gets its own client and connection.
+_youtube_local = threading.local()
+
+
+def _get_youtube_client():
     """
-    Search YouTube for worship songs using the YouTube Data API.
+    Return the calling thread's YouTube Data API client, building it on first use.
+    
+    The client is built from the discovery document bundled with
+    google-api-python-client rather than fetched over the network, and it
+    sends the thread's requests over one persistent httplib2 connection.
+    
+    Returns:
+        googleapiclient Resource for the YouTube v3 API
+    """
+    client = getattr(_youtube_local, "client", None)
+    if client is None:
+        client = _youtube_local.client = googleapiclient.discovery.build(
+            "youtube", "v3",
+            developerKey=_youtube_api_key(),
+            http=httplib2.Http(timeout=30),
+            static_discovery=True,
+            cache_discovery=False
+        )
+    return client
+
+
+def _youtube_search_params(query: str, max_results: int) -> Dict:
+    """Build the search.list parameters shared by the sync and async searches."""
+    return {
+        "q": query,
+        "part": "snippet",
+        "type": "video",
+        "maxResults": max_results,
+        "order": "relevance",
+        "videoCategoryId": "10",  # Music category
+        # Only the fields _parse_search_items() reads
+        "fields": "items(id/videoId,snippet(title,channelTitle))"
+    }
+
+
+def _parse_search_items(response: Dict) -> List[Dict]:
+    """
+    Convert a search.list response into song result dictionaries.
+    
+    Args:
+        response: Decoded search.list response body
+    
+    Returns:
+        List of dictionaries with title, channel, video_id and url
+    """
+    results = []
+    for item in response.get("items", []):
+        result = {
+            "title": item["snippet"]["title"],
+            "channel": item["snippet"]["channelTitle"],
+            "video_id": item["id"]["videoId"],
+            "url": f"https://www.youtube.com/watch?v={item['id']['videoId']}"
+        }
+        results.append(result)
+        logger.debug(f"Found: {result['title']} by {result['channel']}")
+    return results
+
+
+def extract_themes(devotion_text: str, max_themes: int = 5) -> List[str]:
+    """
+    Find the known worship themes mentioned in a devotion summary.
+    
+    Args:
+        devotion_text: Devotion summary (or any text) to scan
+        max_themes: Maximum number of themes to return (default: 5)
+    
+    Returns:
+        Lowercase theme names, most frequently mentioned first
+    """
+    counts: Dict[str, int] = {}
+    for match in _THEME_RE.findall(devotion_text or ""):
+        theme = match.lower()
+        counts[theme] = counts.get(theme, 0) + 1
+    # sorted() is stable, so ties keep the order of first mention
+    return sorted(counts, key=counts.get, reverse=True)[:max_themes]
+
+
+def _normalize_query(query: str) -> str:
+    """
+    Reduce a search query to its theme words so rephrasings share a cache entry.
+    
+    "Christian worship songs about Faith" and "faith worship music" both
+    normalize to "faith".
     
     Args:
         query: Search query for worship songs
-        max_results: Maximum number of results to return (default: 5)
-        
+    
     Returns:
-        List of dictionaries containing:
-        - title: Song title
-        - channel: Artist/Channel name
-        - video_id: YouTube video ID
-        - url: Direct YouTube link
+        Sorted, space-separated theme words (the lowercased query if none remain)
     """
-    if not YOUTUBE_AVAILABLE:
-        logger.error("YouTube API client not available")
-        return [{"error": "YouTube API client not installed. Run: pip install google-api-python-client"}]
+    tokens = _QUERY_TOKEN_RE.findall(query.lower())
+    themes = sorted(set(token for token in tokens if token not in _QUERY_FILLER))
+    return " ".join(themes) or " ".join(tokens)
+
+
+def _song_cache_path(query: str, max_results: int) -> str:
+    """Build the cache file path for a search query."""
+    key = f"{_normalize_query(query)}|{max_results}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    return os.path.join(SONG_CACHE_DIR, f"{digest[:16]}.json")
+
+
+def load_cached_songs(query: str, max_results: int) -> Optional[List[Dict]]:
+    """
+    Load unexpired search results for an equivalent query.
     
+    Args:
+        query: Search query for worship songs
+        max_results: Maximum number of results requested
+    
+    Returns:
+        The cached results, or None on a cache miss
+    """
     try:
-        youtube_api_key = os.getenv("YOUTUBE_API_KEY")
-        if not youtube_api_key:
-            logger.warning("YOUTUBE_API_KEY not configured in .env file")
-            return [{"error": "YOUTUBE_API_KEY not configured in .env file"}]
-        
+        with open(_song_cache_path(query, max_results), encoding="utf-8") as f:
+            entry = json.load(f)
+        if time.time() - entry["timestamp"] > SONG_CACHE_TTL:
+            return None
+        return entry["results"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_cached_songs(query: str, max_results: int, results: List[Dict]) -> None:
+    """
+    Persist search results so later equivalent queries skip the API call.
+    
+    Args:
+        query: Search query for worship songs
+        max_results: Maximum number of results requested
+        results: Parsed search results (without errors)
+    """
+    try:
+        os.makedirs(SONG_CACHE_DIR, exist_ok=True)
+        with open(_song_cache_path(query, max_results), "w", encoding="utf-8") as f:
+            json.dump({
+                "query": query,
+                "results": results,
+                "timestamp": time.time()
+            }, f)
+    except OSError as e:
+        logger.warning(f"Failed to cache worship song results: {e}")
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_search(query: str, max_results: int) -> Tuple[Tuple[Tuple[str, str], ...], ...]:
+    """
+    Memoized YouTube search for an exact (query, max_results) pair.
+    
+    Results are frozen into tuples so the cached value can't be mutated by
+    callers; failures raise and are therefore never cached.
+    
+    Args:
+        query: Search query for worship songs
+        max_results: Maximum number of results to return
+    
+    Returns:
+        Tuple of results, each a tuple of (key, value) pairs
+    """
+    results = load_cached_songs(query, max_results)
+    if results is not None:
+        logger.info(f"Using cached YouTube results for: {query}")
+    else:
         logger.info(f"Searching YouTube for: {query}")
         
-        # Build YouTube API client
-        youtube = googleapiclient.discovery.build(
-            "youtube", "v3", developerKey=youtube_api_key
-        )
-        
-        # Execute search request
-        request = youtube.search().list(
-            q=query,
-            part="snippet",
-            type="video",
-            maxResults=max_results,
-            order="relevance",
-            videoCategoryId="10"  # Music category
-        )
-        
+        # Execute search request on the shared client
+        youtube = _get_youtube_client()
+        request = youtube.search().list(**_youtube_search_params(query, max_results))
         response = request.execute()
         
-        # Parse results
-        results = []
-        for item in response.get("items", []):
-            result = {
-                "title": item["snippet"]["title"],
-                "channel": item["snippet"]["channelTitle"],
-                "video_id": item["id"]["videoId"],
-                "url": f"https://www.youtube.com/watch?v={item['id']['videoId']}"
-            }
-            results.append(result)
-            logger.debug(f"Found: {result['title']} by {result['channel']}")
-        
+        results = _parse_search_items(response)
         logger.info(f"YouTube search returned {len(results)} results for query: {query}")
-        return results
+        save_cached_songs(query, max_results, results)
+    
+    return tuple(tuple(result.items()) for result in results)
+
+
+def _search_error(message: str) -> Dict:
+    """Build the error response returned by the worship song searches."""
+    return {"status": "error", "error": message, "results": []}
+
+
+def search_worship_songs(query: str, max_results: int = 5) -> Dict:
+    """
+    Search YouTube for worship songs using the YouTube Data API.
+    
+    Args:
+        query: Search query for worship songs
+        max_results: Maximum number of results to return (default: 5)
+        
+    Returns:
+        Dict: A structured response dictionary with the following format:
+            {
+                "status": str,  # "success" or "error"
+                "results": List[Dict],  # Songs found (empty on error)
+                "error": str  # Error description (only when status is "error")
+            }
+            
+            Each result dictionary contains:
+                - title: Song title
+                - channel: Artist/Channel name
+                - video_id: YouTube video ID
+                - url: Direct YouTube link
+    """
+    if not YOUTUBE_AVAILABLE:
+        logger.error("YouTube API client not available")
+        return _search_error("YouTube API client not installed. Run: pip install google-api-python-client")
+    
+    if not _youtube_api_key():
+        logger.warning("YOUTUBE_API_KEY not configured in .env file")
+        return _search_error("YOUTUBE_API_KEY not configured in .env file")
+    
+    try:
+        results = [dict(result) for result in _cached_search(query, max_results)]
+        return {"status": "success", "results": results}
     
     except Exception as e:
         logger.error(f"YouTube search failed: {str(e)}")
-        return [{"error": f"YouTube search failed: {str(e)}"}]
+        return _search_error(f"YouTube search failed: {str(e)}")
+
+
+async def search_worship_songs_batch(queries: List[str], max_results: int = 5) -> Dict[str, Dict]:
+    """
+    Run several worship song searches concurrently against the YouTube REST API.
+    
+    All queries share one httpx client, so they reuse a single connection
+    (multiplexed over HTTP/2 when the h2 package is installed) instead of
+    paying a round-trip each in sequence.
+    
+    Args:
+        queries: Search queries for worship songs
+        max_results: Maximum number of results per query (default: 5)
+    
+    Returns:
+        Dictionary mapping each query to a response in the same format as
+        search_worship_songs()
+    """
+    if not HTTPX_AVAILABLE:
+        logger.error("httpx not available for batched YouTube search")
+        return {query: _search_error("httpx not installed. Run: pip install httpx") for query in queries}
+    
+    if not _youtube_api_key():
+        logger.warning("YOUTUBE_API_KEY not configured in .env file")
+        return {query: _search_error("YOUTUBE_API_KEY not configured in .env file") for query in queries}
+    
+    async def search_one(client, query: str) -> Dict:
+        cached = load_cached_songs(query, max_results)
+        if cached is not None:
+            logger.info(f"Using cached YouTube results for: {query}")
+            return {"status": "success", "results": cached}
+        try:
+            params = _youtube_search_params(query, max_results)
+            params["key"] = _youtube_api_key()
+            response = await client.get(YOUTUBE_SEARCH_URL, params=params)
+            response.raise_for_status()
+            results = _parse_search_items(response.json())
+            logger.info(f"YouTube search returned {len(results)} results for query: {query}")
+            save_cached_songs(query, max_results, results)
+            return {"status": "success", "results": results}
+        except Exception as e:
+            logger.error(f"YouTube search failed for '{query}': {str(e)}")
+            return _search_error(f"YouTube search failed: {str(e)}")
+    
+    logger.info(f"Searching YouTube for {len(queries)} queries (HTTP/2: {HTTP2_AVAILABLE})")
+    async with httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=30.0) as client:
+        responses = await asyncio.gather(*(search_one(client, query) for query in queries))
+    
+    return dict(zip(queries, responses))
 
 
 # ============================================================
 # SESSION MANAGEMENT FOR AGENTS
 # ============================================================
 
+# Source of DevotionSession revisions; unique across all sessions in the process
+_REVISIONS = itertools.count(1)
+
+# Agent context template for DevotionSession.get_full_session_context()
+_CTX_TMPL = """
+SESSION CONTEXT:
+================
+
+Devotion Summary:
+{devotion_summary}
+
+User's Personal Reflection:
+{user_reflection}
+
+Processing Summary:
+{user_input_processing}
+
+Generated Prayer:
+{prayer}
+"""
+
+# Placeholder shown for each context field that hasn't been filled in yet
+_CTX_DEFAULTS = (
+    ("devotion_summary", "Not yet retrieved"),
+    ("user_reflection", "Not yet submitted"),
+    ("user_input_processing", "Not yet processed"),
+    ("prayer", "Not yet generated"),
+)
+
+
+@dataclass(slots=True)
 class DevotionSession:
     """
     Manages session state across multiple agent executions.
     Stores outputs from each agent so subsequent agents can access them.
     """
     
-    def __init__(self):
-        """Initialize a new devotion session."""
-        self.session_data = {
-            "timestamp": datetime.now().isoformat(),
-            "devotion_summary": None,
-            "user_reflection": None,
-            "user_input_processing": None,
-            "prayer": None,
-            "agent_history": []
+    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    devotion_summary: Optional[str] = None
+    user_reflection: Optional[str] = None
+    user_input_processing: Optional[str] = None
+    prayer: Optional[str] = None
+    agent_history: List[Dict] = field(default_factory=list)
+    # Clock readings at creation, used to turn history ts_ns values into wall-clock times
+    _start_ns: int = field(default_factory=time.monotonic_ns, init=False, repr=False)
+    _start_epoch: float = field(default_factory=time.time, init=False, repr=False)
+    _rev: int = field(default_factory=lambda: next(_REVISIONS), init=False, repr=False)
+    
+    @property
+    def revision(self) -> int:
+        """
+        Identifier of the session's current state, renewed by every save_* call
+        and every assignment to a public field.
+        
+        Revisions are unique across all DevotionSession instances, so savers
+        can tell if anything changed without tracking which object they saw.
+        
+        Returns:
+            The current revision
+        """
+        return self._rev
+    
+    def __setattr__(self, name, value):
+        # Assigning a public field directly counts as a change, just like a save_* call
+        object.__setattr__(self, name, value)
+        if not name.startswith("_"):
+            object.__setattr__(self, "_rev", next(_REVISIONS))
+    
+    @property
+    def session_data(self) -> Dict:
+        """
+        Snapshot of the session as a plain dictionary (e.g. for persistence).
+        
+        Returns:
+            Dictionary with one key per session field
+        """
+        return {
+            "timestamp": self.timestamp,
+            "devotion_summary": self.devotion_summary,
+            "user_reflection": self.user_reflection,
+            "user_input_processing": self.user_input_processing,
+            "prayer": self.prayer,
+            "agent_history": self.get_agent_history()
         }
     
     def save_devotion_summary(self, summary: str) -> None:
@@ -331,7 +752,7 @@ class DevotionSession:
         Args:
             summary: The devotion summary text
         """
-        self.session_data["devotion_summary"] = summary
+        self.devotion_summary = summary
         self._log_agent_action("devotion_summary_agent", "Retrieved and summarized devotion passages")
     
     def save_user_reflection(self, reflection: str) -> None:
@@ -341,7 +762,7 @@ class DevotionSession:
         Args:
             reflection: The user's reflection text
         """
-        self.session_data["user_reflection"] = reflection
+        self.user_reflection = reflection
         self._log_agent_action("user", "Submitted personal reflection")
     
     def save_user_input_processing(self, processing: str) -> None:
@@ -351,7 +772,7 @@ class DevotionSession:
         Args:
             processing: The processed user input
         """
-        self.session_data["user_input_processing"] = processing
+        self.user_input_processing = processing
         self._log_agent_action("user_input_agent", "Processed and acknowledged user reflection")
     
     def save_prayer(self, prayer: str) -> None:
@@ -361,7 +782,7 @@ class DevotionSession:
         Args:
             prayer: The generated prayer text
         """
-        self.session_data["prayer"] = prayer
+        self.prayer = prayer
         self._log_agent_action("prayer_generator_agent", "Generated personalized prayer")
     
     def get_devotion_summary(self) -> str:
@@ -371,7 +792,7 @@ class DevotionSession:
         Returns:
             The devotion summary, or None if not yet generated
         """
-        return self.session_data.get("devotion_summary")
+        return self.devotion_summary
     
     def get_user_reflection(self) -> str:
         """
@@ -380,7 +801,7 @@ class DevotionSession:
         Returns:
             The user's reflection, or None if not yet submitted
         """
-        return self.session_data.get("user_reflection")
+        return self.user_reflection
     
     def get_user_input_processing(self) -> str:
         """
@@ -389,7 +810,7 @@ class DevotionSession:
         Returns:
             The processed user input, or None if not yet processed
         """
-        return self.session_data.get("user_input_processing")
+        return self.user_input_processing
     
     def get_prayer(self) -> str:
         """
@@ -398,7 +819,7 @@ class DevotionSession:
         Returns:
             The prayer, or None if not yet generated
         """
-        return self.session_data.get("prayer")
+        return self.prayer
     
     def get_full_session_context(self) -> str:
         """
@@ -408,34 +829,24 @@ class DevotionSession:
         Returns:
             Formatted session context string
         """
-        context = f"""
-SESSION CONTEXT:
-================
-
-Devotion Summary:
-{self.session_data.get('devotion_summary', 'Not yet retrieved')}
-
-User's Personal Reflection:
-{self.session_data.get('user_reflection', 'Not yet submitted')}
-
-Processing Summary:
-{self.session_data.get('user_input_processing', 'Not yet processed')}
-
-Generated Prayer:
-{self.session_data.get('prayer', 'Not yet generated')}
-"""
-        return context
+        return _CTX_TMPL.format_map({
+            name: getattr(self, name) or default for name, default in _CTX_DEFAULTS
+        })
     
     def _log_agent_action(self, agent_name: str, action: str) -> None:
         """
         Log an agent action to the session history.
         
+        Only a monotonic timestamp is recorded here; it is converted to ISO
+        format when the history is read.
+        
         Args:
             agent_name: Name of the agent that performed the action
             action: Description of the action
         """
-        self.session_data["agent_history"].append({
-            "timestamp": datetime.now().isoformat(),
+        self._rev = next(_REVISIONS)
+        self.agent_history.append({
+            "ts_ns": time.monotonic_ns(),
             "agent": agent_name,
             "action": action
         })
@@ -445,9 +856,18 @@ Generated Prayer:
         Get the history of all agent actions in this session.
         
         Returns:
-            List of agent action dictionaries
+            List of agent action dictionaries (timestamp, agent, action)
         """
-        return self.session_data["agent_history"]
+        return [
+            {
+                "timestamp": datetime.fromtimestamp(
+                    self._start_epoch + (entry["ts_ns"] - self._start_ns) / 1e9
+                ).isoformat(),
+                "agent": entry["agent"],
+                "action": entry["action"]
+            }
+            for entry in self.agent_history
+        ]
     
     def get_summary(self) -> Dict:
         """
@@ -457,12 +877,12 @@ Generated Prayer:
             Dictionary with session summary
         """
         return {
-            "timestamp": self.session_data["timestamp"],
-            "devotion_retrieved": self.session_data["devotion_summary"] is not None,
-            "user_reflected": self.session_data["user_reflection"] is not None,
-            "reflection_processed": self.session_data["user_input_processing"] is not None,
-            "prayer_generated": self.session_data["prayer"] is not None,
-            "agent_actions_count": len(self.session_data["agent_history"])
+            "timestamp": self.timestamp,
+            "devotion_retrieved": self.devotion_summary is not None,
+            "user_reflected": self.user_reflection is not None,
+            "reflection_processed": self.user_input_processing is not None,
+            "prayer_generated": self.prayer is not None,
+            "agent_actions_count": len(self.agent_history)
         }
 
 
@@ -470,6 +890,244 @@ Generated Prayer:
 # GOOGLE ADK SESSION SERVICE INTEGRATION
 # ============================================================
 
+# Marks a missing entry in dict.get() lookups where None is a valid value
+_MISSING = object()
+
+
+def _dumps(obj) -> bytes:
+    """Serialize checkpoint data to compact JSON bytes (orjson when installed)."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=str, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(blob: bytes):
+    """Deserialize JSON bytes produced by _dumps()."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(blob)
+    return json.loads(blob)
+
+
+def load_checkpoint_data(message: Dict) -> Optional[Dict]:
+    """
+    Get the DevotionSession data stored in a checkpoint message.
+    
+    Checkpoints hold their data as serialized JSON bytes; this decodes it.
+    
+    Args:
+        message: A message from DevotionSessionService.get_session_history()
+    
+    Returns:
+        The checkpointed session data, or None if the message has none
+    """
+    data = message.get("data")
+    if isinstance(data, (bytes, bytearray)):
+        return _loads(data)
+    return data
+
+
+# Role and content that mark a DevotionSessionService.save_session() checkpoint
+_CHECKPOINT_HEADER = {"role": "system", "content": "devotion_session_checkpoint"}
+
+# Message keys stored in their own _SessionBuffer columns
+_MESSAGE_COLUMNS = frozenset({"role", "content", "timestamp", "ts"})
+
+
+class _SessionBuffer:
+    """
+    Column-oriented message store for one session.
+    
+    Each message is split across parallel columns (roles, contents, unboxed
+    float timestamps) instead of being kept as its own dict. Any other keys,
+    such as a checkpoint's "data", go into a sparse extras column.
+    """
+    
+    __slots__ = ("roles", "contents", "timestamps", "extras")
+    
+    def __init__(self):
+        self.roles: List[str] = []
+        self.contents: List[str] = []
+        self.timestamps = array("d")
+        self.extras: List[Optional[Dict]] = []
+    
+    def __len__(self) -> int:
+        # extras is appended last, so every column holds at least this many entries
+        return len(self.extras)
+    
+    def append(self, message: Dict) -> None:
+        """
+        Add a message to the end of the buffer.
+        
+        Args:
+            message: Message dictionary with role, content and either a float
+                "ts" or an ISO "timestamp" (the current time if neither is set)
+        
+        Raises:
+            TypeError, ValueError: If "ts" isn't a number; the buffer is left
+                unchanged
+        """
+        self._append_row(self._row(message))
+    
+    def extend(self, messages: Sequence[Dict]) -> None:
+        """
+        Add several messages to the end of the buffer, all or none.
+        
+        Args:
+            messages: Message dictionaries in the format append() takes
+        
+        Raises:
+            TypeError, ValueError: If any message has a "ts" that isn't a
+                number; the buffer is left unchanged
+        """
+        # Convert every message before appending any, so a bad one can't
+        # leave the earlier ones half-stored
+        rows = [self._row(message) for message in messages]
+        append_row = self._append_row
+        for row in rows:
+            append_row(row)
+    
+    @staticmethod
+    def _row(message: Dict) -> Tuple[str, str, float, Optional[Dict]]:
+        """Validate a message and split it into its column values."""
+        extra = {k: v for k, v in message.items() if k not in _MESSAGE_COLUMNS}
+        ts = message.get("ts")
+        if ts is not None:
+            ts = float(ts)
+        else:
+            timestamp = message.get("timestamp")
+            try:
+                ts = datetime.fromisoformat(timestamp).timestamp()
+            except (TypeError, ValueError):
+                ts = time.time()
+            # Timezone-aware or non-ISO values don't survive the float
+            # column, so keep the original alongside it
+            if timestamp is not None and datetime.fromtimestamp(ts).isoformat() != timestamp:
+                extra["timestamp"] = timestamp
+        
+        return message.get("role"), message.get("content"), ts, extra or None
+    
+    def _append_row(self, row: Tuple[str, str, float, Optional[Dict]]) -> None:
+        """Append an already validated row; nothing here can fail part way."""
+        role, content, ts, extra = row
+        self.roles.append(role)
+        self.contents.append(content)
+        self.timestamps.append(ts)
+        self.extras.append(extra)
+    
+    def message(self, index: int) -> Dict:
+        """
+        Materialize one message as a dictionary.
+        
+        Serialized checkpoint data is kept as bytes in the buffer and only
+        decoded here; "data" on any other message is returned as stored.
+        
+        Args:
+            index: Position of the message in the buffer
+        
+        Returns:
+            Message dictionary with role, content, ISO timestamp and any extra keys
+        """
+        message = {
+            "role": self.roles[index],
+            "content": self.contents[index],
+            "timestamp": datetime.fromtimestamp(self.timestamps[index]).isoformat()
+        }
+        extra = self.extras[index]
+        if extra:
+            message.update(extra)
+            if (
+                message["role"] == _CHECKPOINT_HEADER["role"]
+                and message["content"] == _CHECKPOINT_HEADER["content"]
+                and isinstance(message.get("data"), bytes)
+            ):
+                message["data"] = _loads(message["data"])
+        return message
+
+
+class _MessageView(collections.abc.Sequence):
+    """
+    Read-only sequence over a _SessionBuffer, as of when the view was taken.
+    
+    Message dictionaries are only built when an item is accessed.
+    """
+    
+    __slots__ = ("_buffer", "_length")
+    
+    def __init__(self, buffer: _SessionBuffer):
+        self._buffer = buffer
+        self._length = len(buffer)
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._buffer.message(i) for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("message index out of range")
+        return self._buffer.message(index)
+    
+    def __repr__(self) -> str:
+        return f"_MessageView({list(self)!r})"
+
+
+def _intern(session_id):
+    """
+    Intern a string session ID so dict lookups on it compare by identity.
+    
+    Args:
+        session_id: Session ID (non-str IDs are returned unchanged)
+    
+    Returns:
+        The interned session ID
+    """
+    return sys.intern(session_id) if type(session_id) is str else session_id
+
+
+def _fallback_session_id(session_id: str = None) -> str:
+    """Stand-in for create_session when the ADK service can't provide it."""
+    return session_id or urandom(16).hex()
+
+
+@functools.lru_cache(maxsize=1)
+def _load_session_service_class():
+    """
+    Import ADK's InMemorySessionService once per process.
+    
+    Returns:
+        The InMemorySessionService class, or None if ADK isn't installed
+    """
+    try:
+        from google.adk.sessions import InMemorySessionService
+    except ImportError:
+        return None
+    return InMemorySessionService
+
+
+def _probe_method(service, name: str, *args):
+    """
+    Look up a synchronous session service method that accepts the given arguments.
+    
+    Args:
+        service: Session service instance (may be None)
+        name: Method name to look up
+        *args: Example positional arguments the method will be called with
+    
+    Returns:
+        The bound method, or None if it is missing, async, or has a different signature
+    """
+    method = getattr(service, name, None)
+    if not callable(method) or inspect.iscoroutinefunction(method):
+        return None
+    try:
+        inspect.signature(method).bind(*args)
+    except (TypeError, ValueError):
+        return None
+    return method
+
+
 class DevotionSessionService:
     """
     Wraps Google ADK's InMemorySessionService for persistent agent sessions.
@@ -477,19 +1135,99 @@ class DevotionSessionService:
     
     Uses Google ADK patterns for session management as referenced in:
     https://www.kaggle.com/code/edwardyuen2/day-3a-agent-sessions
+    
+    Checkpoints from save_session() are written behind: the latest one per
+    session is held until a background thread serializes and stores it, so
+    call flush() to wait for them. Use load_checkpoint_data() to read the data
+    back from a checkpoint message.
+    
+    If the ADK service can't store and return messages itself, messages are
+    kept in a local column-oriented _SessionBuffer per session instead. Local
+    buffers and cached histories are kept for the most recently used
+    max_sessions sessions; older ones are evicted.
     """
     
-    def __init__(self):
-        """Initialize the session service."""
+    # Maximum number of checkpoints stored per wake-up of the flusher thread
+    FLUSH_BATCH_SIZE = 32
+    
+    # Seconds to wait at interpreter exit for pending checkpoints to be stored
+    EXIT_FLUSH_TIMEOUT = 5.0
+    
+    # Fixed part of every checkpoint message
+    _CHECKPOINT_HEADER = _CHECKPOINT_HEADER
+    
+    def __init__(self, max_sessions: int = 1024):
+        """
+        Initialize the session service.
+        
+        Args:
+            max_sessions: Maximum number of sessions to keep local buffers and
+                cached histories for (default: 1024)
+        
+        Raises:
+            ValueError: If max_sessions is less than 1
+        """
+        if max_sessions < 1:
+            # A zero-size LRU would evict every buffer as soon as it is created
+            raise ValueError(f"max_sessions must be at least 1, got {max_sessions}")
+        self.max_sessions = max_sessions
         self.service = None
         self.use_adk = False
-        try:
-            from google.adk.sessions import InMemorySessionService
-            self.service = InMemorySessionService()
+        service_class = _load_session_service_class()
+        if service_class is None:
+            print("⚠️  Using custom session management (ADK not available: ImportError)")
+        else:
+            # Errors constructing an installed ADK service are real bugs; let them surface
+            self.service = service_class()
             self.use_adk = True
             print("✓ Using Google ADK InMemorySessionService for session management")
-        except (ImportError, Exception) as e:
-            print(f"⚠️  Using custom session management (ADK not available: {type(e).__name__})")
+        
+        # Probe the service once and bind the dispatch targets (_create,
+        # _store_message, _store_messages, _get_history) straight to the service's bound methods
+        # or local stand-ins, so calls below need no guards or extra lookups
+        self._create = _probe_method(self.service, "create_session", "") or _fallback_session_id
+        self._buffers: "collections.OrderedDict[str, _SessionBuffer]" = collections.OrderedDict()
+        adk_store = _probe_method(self.service, "store_message", "", {})
+        adk_history = _probe_method(self.service, "get_session_history", "")
+        if adk_store and adk_history:
+            self._store_message = adk_store
+            self._store_messages = (
+                _probe_method(self.service, "store_messages", "", []) or self._store_each
+            )
+            self._get_history = adk_history
+        else:
+            self._store_message = self._buffer_store
+            self._store_messages = self._buffer_store_many
+            self._get_history = self._buffer_history
+        
+        # session_id -> DevotionSession revision of the last checkpoint stored
+        self._last_rev: Dict[str, int] = {}
+        
+        # Latest unsaved (revision, checkpoint) per session, drained by
+        # _flush_loop(); a newer checkpoint replaces a pending one rather than
+        # queueing behind it
+        self._pending: Dict[str, Tuple[int, Dict]] = {}
+        
+        # Spare checkpoint dicts for save_session() to refill. Only dicts nothing
+        # else holds on to go back in: replaced pending checkpoints, and stored
+        # ones when the local buffer (which copies fields out) is the sink.
+        self._payload_pool = collections.deque(maxlen=64)
+        self._cv = threading.Condition()
+        self._inflight = 0
+        self._flusher = None
+        
+        # session_id -> (version, history) from the last get_session_history() call.
+        # Every store through this wrapper gives the session a new version from
+        # _versions, which invalidates its cached history.
+        self._hist_cache: "collections.OrderedDict[str, Tuple[int, Sequence[Dict]]]" = collections.OrderedDict()
+        self._hist_version: Dict[str, int] = {}
+        self._versions = itertools.count(1)
+        
+        # Guards _buffers, _hist_cache, _hist_version and _last_rev, which the
+        # flusher thread updates alongside callers. Reentrant because the local
+        # store runs under it both directly and from the flusher. Never held
+        # across a call into the ADK service.
+        self._state_lock = threading.RLock()
     
     def create_session(self, session_id: str = None) -> str:
         """
@@ -499,17 +1237,9 @@ class DevotionSessionService:
             session_id: Optional custom session ID. If None, auto-generated.
             
         Returns:
-            The session ID
+            The session ID (interned, so it is cheap to use as a dict key)
         """
-        if self.use_adk and self.service:
-            try:
-                return self.service.create_session(session_id)
-            except Exception:
-                pass
-        
-        # Fallback: create simple session ID
-        import uuid
-        return session_id or str(uuid.uuid4())
+        return _intern(self._create(session_id))
     
     def store_message(self, session_id: str, message: Dict) -> None:
         """
@@ -519,46 +1249,272 @@ class DevotionSessionService:
             session_id: The session ID
             message: Message dictionary with role, content, timestamp
         """
-        if self.use_adk and self.service:
-            try:
-                self.service.store_message(session_id, message)
-            except Exception:
-                pass
+        session_id = _intern(session_id)
+        try:
+            self._store_message(session_id, message)
+        finally:
+            # Invalidate even on failure; the service may have kept part of it
+            with self._state_lock:
+                self._hist_version[session_id] = next(self._versions)
+    
+    def store_messages(self, session_id: str, messages: Iterable[Dict]) -> None:
+        """
+        Store several messages in the session at once.
+        
+        Prefer this over repeated store_message() calls when a turn produces a
+        burst of messages (user input, tool calls, agent reply): the service's
+        bulk call is used when it has one and the session's cached history is
+        invalidated once.
+        
+        Args:
+            session_id: The session ID
+            messages: Message dictionaries with role, content, timestamp, oldest first
+        """
+        session_id = _intern(session_id)
+        # Accept any iterable; the stores below index and re-iterate it
+        messages = list(messages)
+        if not messages:
+            return
+        try:
+            self._store_messages(session_id, messages)
+        finally:
+            # Invalidate even on failure; the service may have kept part of it
+            with self._state_lock:
+                self._hist_version[session_id] = next(self._versions)
+    
+    def _store_each(self, session_id: str, messages: Sequence[Dict]) -> None:
+        """Store messages one by one for services without a bulk call."""
+        store_message = self._store_message
+        for message in messages:
+            store_message(session_id, message)
+    
+    def _buffer_store_many(self, session_id: str, messages: Sequence[Dict]) -> None:
+        """Append several messages to the session's local buffer, all or none."""
+        # Hold the lock throughout so the buffer can't be evicted mid-store
+        with self._state_lock:
+            self._session_buffer(session_id).extend(messages)
+    
+    def _buffer_store(self, session_id: str, message: Dict) -> None:
+        """Append a message to the session's local buffer."""
+        with self._state_lock:
+            self._session_buffer(session_id).append(message)
+    
+    def _session_buffer(self, session_id: str) -> _SessionBuffer:
+        """
+        Return the session's local buffer, creating it (and evicting the least
+        recently used one if over max_sessions) as needed.
+        
+        Called with _state_lock held.
+        """
+        buffer = self._buffers.get(session_id)
+        if buffer is None:
+            buffer = self._buffers[session_id] = _SessionBuffer()
+            if len(self._buffers) > self.max_sessions:
+                self._evict(self._buffers.popitem(last=False)[0])
+        else:
+            self._buffers.move_to_end(session_id)
+        return buffer
     
-    def get_session_history(self, session_id: str) -> List[Dict]:
+    def _evict(self, session_id: str) -> None:
+        """
+        Drop the rest of the local state for a session whose buffer was evicted.
+        
+        Called with _state_lock held.
+        """
+        self._hist_cache.pop(session_id, None)
+        self._hist_version.pop(session_id, None)
+        self._last_rev.pop(session_id, None)
+    
+    def _buffer_history(self, session_id: str) -> Sequence[Dict]:
+        """Return a view over the session's local buffer."""
+        with self._state_lock:
+            buffer = self._buffers.get(session_id)
+            return _MessageView(buffer) if buffer is not None else ()
+    
+    def get_session_history(self, session_id: str) -> Sequence[Dict]:
         """
         Retrieve all messages in a session.
         
+        The list is cached until the next message is stored for the session,
+        so repeated calls within a turn don't go back to the service. Treat
+        it as read-only.
+        
         Args:
             session_id: The session ID
             
         Returns:
-            List of message dictionaries in the session
+            Sequence of message dictionaries in the session
         """
-        if self.use_adk and self.service:
-            try:
-                return self.service.get_session_history(session_id)
-            except Exception:
-                pass
-        return []
+        session_id = _intern(session_id)
+        lock = self._state_lock
+        with lock:
+            # Read the version before fetching so a concurrent store invalidates the result
+            version = self._hist_version.get(session_id, 0)
+            cached = self._hist_cache.get(session_id, _MISSING)
+            if cached is not _MISSING and cached[0] == version:
+                self._hist_cache.move_to_end(session_id)
+                return cached[1]
+        
+        # Fetch outside the lock; the ADK service may be slow
+        history = self._get_history(session_id)
+        with lock:
+            self._hist_cache[session_id] = (version, history)
+            self._hist_cache.move_to_end(session_id)
+            if len(self._hist_cache) > self.max_sessions:
+                self._hist_cache.popitem(last=False)
+        return history
+    
+    def get_session_roles(self, session_id: str) -> List[str]:
+        """
+        Retrieve just the role of each message in a session.
+        
+        Args:
+            session_id: The session ID
+            
+        Returns:
+            List of message roles, oldest first
+        """
+        session_id = _intern(session_id)
+        with self._state_lock:
+            buffer = self._buffers.get(session_id)
+            if buffer is not None:
+                return buffer.roles[:len(buffer)]
+        return [message.get("role") for message in self.get_session_history(session_id)]
+    
+    def get_session_contents(self, session_id: str) -> List[str]:
+        """
+        Retrieve just the content of each message in a session.
+        
+        Args:
+            session_id: The session ID
+            
+        Returns:
+            List of message contents, oldest first
+        """
+        session_id = _intern(session_id)
+        with self._state_lock:
+            buffer = self._buffers.get(session_id)
+            if buffer is not None:
+                return buffer.contents[:len(buffer)]
+        return [message.get("content") for message in self.get_session_history(session_id)]
     
     def save_session(self, session_id: str, devotion_session: 'DevotionSession') -> None:
         """
         Save a DevotionSession's data through the service.
         Persists the session state using ADK's InMemorySessionService if available.
         
+        The checkpoint is stored by the background flusher thread, keeping the
+        store off the caller's path; use flush() to wait for it. If an earlier
+        checkpoint for the session hasn't been stored yet it is replaced, since
+        only the latest state is worth persisting.
+        
+        Saving a DevotionSession that hasn't changed since its last save is a no-op.
+        
         Args:
             session_id: The session ID
             devotion_session: The DevotionSession object to save
         """
-        if self.use_adk and self.service:
+        session_id = _intern(session_id)
+        revision = devotion_session.revision
+        with self._cv, self._state_lock:
+            pending = self._pending.get(session_id)
+            if revision == self._last_rev.get(session_id) or (pending and pending[0] == revision):
+                return
+        
+        # session_data is already a fresh snapshot, so the checkpoint can hold it directly
+        try:
+            # popleft() is atomic; checking the pool first would race other savers
+            session_data = self._payload_pool.popleft()
+        except IndexError:
+            session_data = {}
+        session_data.update(self._CHECKPOINT_HEADER)
+        session_data["data"] = devotion_session.session_data
+        session_data["ts"] = time.time()
+        with self._cv:
+            replaced = self._pending.get(session_id)
+            self._pending[session_id] = (revision, session_data)
+            self._cv.notify_all()
+            if replaced is not None:
+                self._recycle(replaced[1])
+            if self._flusher is None:
+                self._flusher = threading.Thread(
+                    target=self._flush_loop, name="devotion-session-flusher", daemon=True
+                )
+                self._flusher.start()
+                # Bounded so a hung service can't block interpreter exit
+                atexit.register(self.flush, self.EXIT_FLUSH_TIMEOUT)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every pending checkpoint has been stored.
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+        
+        Returns:
+            True if the queue was drained, False if the timeout expired first
+        """
+        with self._cv:
+            return self._cv.wait_for(lambda: not self._pending and not self._inflight, timeout)
+    
+    def _recycle(self, session_data: Dict) -> None:
+        """Return a checkpoint dict nothing else references to the payload pool."""
+        session_data.clear()
+        self._payload_pool.append(session_data)
+    
+    def _flush_loop(self) -> None:
+        """Store pending checkpoints in batches; runs on the flusher thread."""
+        # The dispatch targets never change after __init__, so bind them once
+        store_message = self._store_message
+        local_sink = store_message == self._buffer_store
+        state_lock = self._state_lock
+        versions = self._versions
+        recycle = self._recycle
+        
+        while True:
+            with self._cv:
+                while not self._pending:
+                    self._cv.wait()
+                batch = [
+                    self._pending.popitem()
+                    for _ in range(min(len(self._pending), self.FLUSH_BATCH_SIZE))
+                ]
+                self._inflight += len(batch)
+            
+            # Store outside the lock so save_session() never waits on the service
             try:
-                session_data = {
-                    "role": "system",
-                    "content": "devotion_session_checkpoint",
-                    "data": devotion_session.session_data,
-                    "timestamp": datetime.now().isoformat()
-                }
-                self.service.store_message(session_id, session_data)
-            except Exception:
-                pass
+                for session_id, (revision, session_data) in batch:
+                    try:
+                        # Serialize here, off the caller's path; readers decode on demand
+                        session_data["data"] = _dumps(session_data["data"])
+                        if not local_sink:
+                            # The local buffer keeps the float; ADK gets an ISO timestamp
+                            session_data["timestamp"] = datetime.fromtimestamp(session_data.pop("ts")).isoformat()
+                        store_message(session_id, session_data)
+                        with state_lock:
+                            self._hist_version[session_id] = next(versions)
+                            # Only a stored checkpoint lets later saves of this revision be skipped
+                            self._last_rev[session_id] = revision
+                        if local_sink:
+                            recycle(session_data)
+                    except Exception as e:
+                        logger.error(f"Failed to store session checkpoint for {session_id}: {e}")
+            finally:
+                # Always release flush() waiters, even if the thread is dying
+                with self._cv:
+                    self._inflight -= len(batch)
+                    self._cv.notify_all()
+
+
+@functools.lru_cache(maxsize=1)
+def get_session_service() -> DevotionSessionService:
+    """
+    Get the process-wide DevotionSessionService.
+    
+    Sharing one instance means ADK is set up once and every agent shares the
+    same buffers, history cache and flusher thread.
+    
+    Returns:
+        The shared DevotionSessionService
+    """
+    return DevotionSessionService()